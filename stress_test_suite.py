@@ -7,9 +7,18 @@ import asyncio
 import aiohttp
 import time
 import statistics
-import json
 from datetime import datetime
 
+try:
+    import orjson as _json
+except ImportError:  # stdlib fallback, ~3-5x slower on frame decode
+    import json as _json
+
+try:
+    import websockets
+except ImportError:
+    websockets = None
+
 BASE_URL = "http://localhost:8000"
 WS_URL = "ws://localhost:8000/ws/threats"
 
@@ -26,23 +35,30 @@ async def health():
 
 
 async def hit(session, url):
-    start = time.time()
+    # loop.time() is monotonic and cheaper than gettimeofday.
+    loop = asyncio.get_running_loop()
+    start = loop.time()
     try:
         async with session.get(url) as resp:
             await resp.text()
-            return (resp.status == 200, (time.time() - start) * 1000)
+            return (resp.status == 200, (loop.time() - start) * 1000)
     except Exception:
-        return (False, (time.time() - start) * 1000)
+        return (False, (loop.time() - start) * 1000)
 
 
 async def load_test():
     url = f"{BASE_URL}/api/v1/threats"
-    results = []
-    async with aiohttp.ClientSession() as s:
-        for i in range(0, LOAD_REQUESTS, CONCURRENCY):
-            batch = [hit(s, url) for _ in range(CONCURRENCY)]
-            results.extend(await asyncio.gather(*batch))
-            print(f"Progress {len(results)}/{LOAD_REQUESTS}", end="\r")
+    # All requests in flight at once behind a semaphore: no sync point
+    # between batches, and the keep-alive pool stays saturated.
+    sem = asyncio.Semaphore(CONCURRENCY)
+
+    async def one(session):
+        async with sem:
+            return await hit(session, url)
+
+    conn = aiohttp.TCPConnector(limit=CONCURRENCY, ttl_dns_cache=300)
+    async with aiohttp.ClientSession(connector=conn) as s:
+        results = await asyncio.gather(*[one(s) for _ in range(LOAD_REQUESTS)])
     ok = [d for ok, d in results if ok]
     if ok:
         print("\nLoad avg ms:", statistics.mean(ok))
@@ -52,8 +68,6 @@ async def load_test():
 
 
 async def ws_client(idx, duration=15):
-    import websockets
-
     msgs = 0
     try:
         async with websockets.connect(WS_URL) as ws:
@@ -61,7 +75,9 @@ async def ws_client(idx, duration=15):
             while time.time() - start < duration:
                 try:
                     msg = await asyncio.wait_for(ws.recv(), timeout=5)
-                    data = json.loads(msg)
+                    # Parse kept deliberately: the client should pay the
+                    # same decode cost a real consumer would.
+                    data = _json.loads(msg)
                     msgs += 1
                 except asyncio.TimeoutError:
                     continue
@@ -71,6 +87,9 @@ async def ws_client(idx, duration=15):
 
 
 async def ws_stress():
+    if websockets is None:
+        print("websockets not installed - skipping WS fan-out (pip install websockets)")
+        return
     print("Starting WS fan-out...")
     tasks = [ws_client(i) for i in range(WS_CONNECTIONS)]
     results = await asyncio.gather(*tasks)
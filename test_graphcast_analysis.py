@@ -3,81 +3,137 @@
 Test GraphCast Analysis to understand current detection behavior
 """
 
+import os
 import sys
+import time
 sys.path.append('.')
+import numpy as np
 from weather_anomaly_detection import WeatherAnomalyDetector
 
+SAMPLE_CACHE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                            'sample_data.npz')
+
+
+def _build_sample_data():
+    """Sample data that mimics current mock structure, as contiguous
+    float32 so the detector gets zero-copy buffers."""
+    return {
+        'u_component_of_wind': np.ascontiguousarray(
+            [[10, 15, 20, 25, 30], [35, 40, 45, 50, 55], [60, 65, 70, 75, 80],
+             [85, 90, 95, 100, 105], [110, 115, 120, 125, 130]], dtype=np.float32),
+        'v_component_of_wind': np.ascontiguousarray(
+            [[5, 10, 15, 20, 25], [30, 35, 40, 45, 50], [55, 60, 65, 70, 75],
+             [80, 85, 90, 95, 100], [105, 110, 115, 120, 125]], dtype=np.float32),
+        'sea_level_pressure': np.ascontiguousarray(
+            [[1010, 1005, 1000, 995, 990], [985, 980, 975, 970, 965], [960, 955, 950, 945, 940],
+             [935, 930, 925, 920, 915], [910, 905, 900, 895, 890]], dtype=np.float32),
+        'total_precipitation': np.ascontiguousarray(
+            [[0.01, 0.05, 0.1, 0.15, 0.2], [0.25, 0.3, 0.35, 0.4, 0.45], [0.5, 0.55, 0.6, 0.65, 0.7],
+             [0.75, 0.8, 0.85, 0.9, 0.95], [1.0, 1.05, 1.1, 1.15, 1.2]], dtype=np.float32),
+        'soil_moisture': np.ascontiguousarray(
+            [[0.6, 0.7, 0.8, 0.85, 0.9], [0.92, 0.94, 0.96, 0.98, 1.0], [0.95, 0.97, 0.99, 1.0, 1.0],
+             [0.9, 0.92, 0.94, 0.96, 0.98], [0.85, 0.87, 0.89, 0.91, 0.93]], dtype=np.float32),
+    }
+
+
+def _load_or_build(rebuild=False):
+    """Load the sample fields from the on-disk .npz cache, building it on
+    first run. Run with --rebuild to regenerate after editing the
+    literals. Keeps cold starts a single mmap once the corpus outgrows
+    this toy grid."""
+    if rebuild or not os.path.exists(SAMPLE_CACHE):
+        data = _build_sample_data()
+        np.savez(SAMPLE_CACHE, **data)
+        return data
+    cached = np.load(SAMPLE_CACHE, mmap_mode='r')
+    return {key: cached[key] for key in cached.files}
+
+
+sample_data = _load_or_build(rebuild='--rebuild' in sys.argv)
+# Guard against a future edit silently reverting to list literals.
+for _arr in sample_data.values():
+    assert _arr.flags['C_CONTIGUOUS'] and _arr.dtype == np.float32
+
 def test_graphcast_analysis():
     """Test current GraphCast analysis with sample data"""
-    
+
     detector = WeatherAnomalyDetector()
-    
-    # Sample data that mimics current mock structure
-    sample_data = {
-        'u_component_of_wind': [[10, 15, 20, 25, 30], [35, 40, 45, 50, 55], [60, 65, 70, 75, 80], 
-                               [85, 90, 95, 100, 105], [110, 115, 120, 125, 130]],
-        'v_component_of_wind': [[5, 10, 15, 20, 25], [30, 35, 40, 45, 50], [55, 60, 65, 70, 75],
-                               [80, 85, 90, 95, 100], [105, 110, 115, 120, 125]],
-        'sea_level_pressure': [[1010, 1005, 1000, 995, 990], [985, 980, 975, 970, 965], [960, 955, 950, 945, 940],
-                               [935, 930, 925, 920, 915], [910, 905, 900, 895, 890]],
-        'total_precipitation': [[0.01, 0.05, 0.1, 0.15, 0.2], [0.25, 0.3, 0.35, 0.4, 0.45], [0.5, 0.55, 0.6, 0.65, 0.7],
-                               [0.75, 0.8, 0.85, 0.9, 0.95], [1.0, 1.05, 1.1, 1.15, 1.2]],
-        'soil_moisture': [[0.6, 0.7, 0.8, 0.85, 0.9], [0.92, 0.94, 0.96, 0.98, 1.0], [0.95, 0.97, 0.99, 1.0, 1.0],
-                               [0.9, 0.92, 0.94, 0.96, 0.98], [0.85, 0.87, 0.89, 0.91, 0.93]]
-    }
-    
+
+    # Time the first and second calls: the detector warms its Numba
+    # kernels (cache=True) at import, so the first call should already be
+    # compiled. Running this test also populates the on-disk JIT cache for
+    # production cold starts.
+    t0 = time.perf_counter()
     results = detector.detect_all_hazards(sample_data)
-    
-    print('=== GRAPHCAST ANALYSIS RESULTS ===')
-    print(f'Cyclones detected: {len(results["cyclones"])}')
-    print(f'Floods detected: {len(results["floods"])}') 
-    print(f'Landslides detected: {len(results["landslides"])}')
-    print(f'Convergence zones: {len(results["convergences"])}')
-    
-    print('\n=== DETAILED CYCLONE ANALYSIS ===')
+    first_s = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    detector.detect_all_hazards(sample_data)
+    second_s = time.perf_counter() - t0
+
+    # Build the whole report in memory and emit it with one write — one
+    # syscall instead of one per print line.
+    out = []
+    w = out.append
+    w('=== GRAPHCAST ANALYSIS RESULTS ===')
+    w(f'Cyclones detected: {len(results["cyclones"])}')
+    w(f'Floods detected: {len(results["floods"])}')
+    w(f'Landslides detected: {len(results["landslides"])}')
+    w(f'Convergence zones: {len(results["convergences"])}')
+
+    w('\n=== DETAILED CYCLONE ANALYSIS ===')
     for cyclone in results['cyclones']:
-        print(f'Cyclone ID: {cyclone["id"]}')
-        print(f'  Location: {cyclone["center_lat"]:.2f}, {cyclone["center_lon"]:.2f}')
-        print(f'  Intensity: {cyclone["intensity"]}')
-        print(f'  Max Wind: {cyclone["max_wind_speed"]:.1f} kt')
-        print(f'  Min Pressure: {cyclone["min_pressure"]:.1f} hPa')
-        print(f'  Confidence: {cyclone["detection_confidence"]:.2f}')
-        print(f'  Radius: {cyclone["radius_km"]:.1f} km')
-    
-    print('\n=== DETAILED FLOOD ANALYSIS ===')
+        w(f'Cyclone ID: {cyclone["id"]}\n'
+          f'  Location: {cyclone["center_lat"]:.2f}, {cyclone["center_lon"]:.2f}\n'
+          f'  Intensity: {cyclone["intensity"]}\n'
+          f'  Max Wind: {cyclone["max_wind_speed"]:.1f} kt\n'
+          f'  Min Pressure: {cyclone["min_pressure"]:.1f} hPa\n'
+          f'  Confidence: {cyclone["detection_confidence"]:.2f}\n'
+          f'  Radius: {cyclone["radius_km"]:.1f} km')
+
+    w('\n=== DETAILED FLOOD ANALYSIS ===')
     for flood in results['floods']:
-        print(f'Flood ID: {flood["id"]}')
-        print(f'  Location: {flood["center_lat"]:.2f}, {flood["center_lon"]:.2f}')
-        print(f'  Severity: {flood["severity"]}')
-        print(f'  Expected Runoff: {flood["expected_runoff_mm"]:.1f} mm')
-        print(f'  Confidence: {flood["detection_confidence"]:.2f}')
-    
-    print('\n=== ANALYSIS METHOD EXPLANATION ===')
-    print('1. CYCLONE DETECTION:')
-    print('   - Scans wind speed arrays for cyclonic rotation')
-    print('   - Looks for pressure drops below 1000 hPa')
-    print('   - Calculates vorticity (rotation)')
-    print('   - Classifies by Saffir-Simpson scale')
-    print('   - Estimates radius and forward speed')
-    
-    print('\n2. FLOOD DETECTION:')
-    print('   - Scans precipitation arrays')
-    print('   - Identifies areas > 50mm/24hr (heavy rain)')
-    print('   - Checks soil moisture saturation')
-    print('   - Calculates flood risk based on intensity')
-    
-    print('\n3. LANDSLIDE DETECTION:')
-    print('   - Analyzes slope stability factors')
-    print('   - Checks soil saturation levels')
-    print('   - Evaluates rainfall intensity')
-    print('   - Calculates susceptibility scores')
-    
-    print('\n4. CONVERGENCE DETECTION:')
-    print('   - Groups hazards by geographic proximity')
-    print('   - Identifies multi-hazard zones')
-    print('   - Applies risk multipliers')
-    print('   - Generates compound emergency recommendations')
-    
+        w(f'Flood ID: {flood["id"]}\n'
+          f'  Location: {flood["center_lat"]:.2f}, {flood["center_lon"]:.2f}\n'
+          f'  Severity: {flood["severity"]}\n'
+          f'  Expected Runoff: {flood["expected_runoff_mm"]:.1f} mm\n'
+          f'  Confidence: {flood["detection_confidence"]:.2f}')
+
+    w('\n=== ANALYSIS METHOD EXPLANATION ===')
+    w('1. CYCLONE DETECTION:')
+    w('   - Scans wind speed arrays for cyclonic rotation')
+    w('   - Looks for pressure drops below 1000 hPa')
+    w('   - Calculates vorticity (rotation)')
+    w('   - Classifies by Saffir-Simpson scale')
+    w('   - Estimates radius and forward speed')
+
+    w('\n2. FLOOD DETECTION:')
+    w('   - Scans precipitation arrays')
+    w('   - Identifies areas > 50mm/24hr (heavy rain)')
+    w('   - Checks soil moisture saturation')
+    w('   - Calculates flood risk based on intensity')
+
+    w('\n3. LANDSLIDE DETECTION:')
+    w('   - Analyzes slope stability factors')
+    w('   - Checks soil saturation levels')
+    w('   - Evaluates rainfall intensity')
+    w('   - Calculates susceptibility scores')
+
+    w('\n4. CONVERGENCE DETECTION:')
+    w('   - Groups hazards by geographic proximity')
+    w('   - Identifies multi-hazard zones')
+    w('   - Applies risk multipliers')
+    w('   - Generates compound emergency recommendations')
+
+    w('\n=== KERNEL WARMUP CHECK ===')
+    w(f'First detect_all_hazards:  {first_s * 1000:.2f} ms')
+    w(f'Second detect_all_hazards: {second_s * 1000:.2f} ms')
+    if first_s > 5 * second_s:
+        w('WARNING: first call paid JIT cost - import-time warmup or the '
+          'Numba cache did not fire')
+
+    sys.stdout.write('\n'.join(out))
+    sys.stdout.write('\n')
+
     return results
 
 if __name__ == "__main__":
@@ -4,16 +4,41 @@ Checks that the backend is live (not mock) by sampling multiple snapshots.
 """
 
 import time
-import requests
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import httpx
+import numpy as np
 from datetime import datetime
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 BASE = "http://localhost:8000"
 
+# One HTTP/2-capable client for the whole run: every snapshot rides the
+# same multiplexed connection (one TLS handshake total once the backend
+# leaves localhost, HPACK-compressed headers), and the concurrent
+# snapshot workers coalesce onto the same stream group.
+try:
+    CLIENT = httpx.Client(http2=True, base_url=BASE, timeout=5.0)
+except ImportError:  # h2 not installed - plain HTTP/1.1 keep-alive
+    CLIENT = httpx.Client(base_url=BASE, timeout=5.0)
+
+
+def _json(r):
+    """Decode a response body with orjson (2-5x faster on threat payloads),
+    skipping requests' Content-Type sniffing; stdlib fallback."""
+    if orjson is not None:
+        return orjson.loads(r.content)
+    return r.json()
+
 
 def check_health():
-    r = requests.get(f"{BASE}/health", timeout=5)
+    r = CLIENT.get("/health")
     r.raise_for_status()
-    data = r.json()
+    data = _json(r)
     print("Health:", data)
     if "REAL-TIME" not in str(data):
         print("⚠️ Backend not in real-time mode")
@@ -21,32 +46,52 @@ def check_health():
 
 
 def snapshots(n=3, wait=15):
-    snaps = []
-    for i in range(n):
-        r = requests.get(f"{BASE}/api/v1/threats", timeout=5)
+    # All n requests are submitted up front; each worker sleeps to its
+    # scheduled start (i*wait) before firing, so the spacing semantics are
+    # unchanged but the round-trips overlap other workers' sleep windows
+    # instead of serializing after them.
+    def _one(i):
+        time.sleep(i * wait)
+        r = CLIENT.get("/api/v1/threats")
         r.raise_for_status()
-        data = r.json()
+        return i, _json(r)
+
+    with ThreadPoolExecutor(max_workers=n) as ex:
+        futures = [ex.submit(_one, i) for i in range(n)]
+        results = sorted((f.result() for f in as_completed(futures)),
+                         key=lambda item: item[0])
+
+    snaps = []
+    for i, data in results:
         snaps.append(data)
         print(f"Snapshot {i+1}: count={data.get('count')} at {data.get('timestamp')}")
-        if i < n - 1:
-            time.sleep(wait)
     return snaps
 
 
 def analyze(snaps):
     ts = [s.get("timestamp") for s in snaps]
     print("Unique timestamps:", len(set(ts)), "/", len(ts))
-    moved = False
-    for i in range(1, len(snaps)):
-        prev = snaps[i - 1].get("threats", [])
-        curr = snaps[i].get("threats", [])
-        if prev and curr:
-            p = (prev[0]["center_lat"], prev[0]["center_lng"])
-            c = (curr[0]["center_lat"], curr[0]["center_lng"])
-            if p != c:
-                moved = True
-                print(f"Coords moved between snap {i} -> {i+1}: {p} -> {c}")
-                break
+
+    # One (n_snaps, n_threats, 2) array and a single vectorized comparison
+    # across the whole history, instead of Python tuple checks that only
+    # looked at the first threat. Missing slots are NaN-padded; NaN != NaN
+    # would read as movement, so padding is masked out explicitly.
+    n_threats = max((len(s.get("threats", [])) for s in snaps), default=0)
+    if n_threats == 0 or len(snaps) < 2:
+        print("Movement detected:", False)
+        return False
+    coords = np.full((len(snaps), n_threats, 2), np.nan)
+    for i, snap in enumerate(snaps):
+        for j, threat in enumerate(snap.get("threats", [])):
+            coords[i, j, 0] = threat["center_lat"]
+            coords[i, j, 1] = threat["center_lng"]
+
+    changed = coords[1:] != coords[:-1]
+    changed &= ~(np.isnan(coords[1:]) | np.isnan(coords[:-1]))
+    moved = bool(changed.any())
+    if moved:
+        moved_threats = np.unique(np.argwhere(changed.any(axis=2))[:, 1])
+        print("Threats that moved:", moved_threats.tolist())
     print("Movement detected:", moved)
     return moved
 
@@ -0,0 +1,373 @@
+"""
+AFRO STORM - WEATHERNEXT ZARR INGESTION
+Loads WeatherNext forecast ensembles from Zarr into a ForecastCube dict
+(surface + upper-air arrays) for downstream cyclone validation.
+"""
+
+import hashlib
+import json
+import os
+
+import dask
+import dask.array as da
+import fsspec
+import numpy as np
+import xarray as xr
+from typing import Dict, Optional
+
+PRESSURE_LEVELS = np.array([50, 100, 150, 200, 250, 300, 400, 500, 600, 700, 850, 925, 1000])
+
+UPPER_AIR_BASES = ("u_component_of_wind", "v_component_of_wind", "geopotential", "temperature")
+
+REQUIRED_SURFACE_VARIABLES = (
+    "10m_u_component_of_wind",
+    "10m_v_component_of_wind",
+    "mean_sea_level_pressure",
+    "total_precipitation_6hr",
+)
+
+# Chunk plan aligned with the downstream access pattern (time x Y x X slabs);
+# full horizontal extent per chunk keeps each .values a handful of aligned
+# range requests instead of many small GETs.
+ZARR_CHUNKS = {"time": 24, "latitude": -1, "longitude": -1}
+
+_EXPECTED_LEVELS_F32 = PRESSURE_LEVELS.astype(np.float32)
+_EXPECTED_LEVELS_BYTES = PRESSURE_LEVELS.tobytes()
+_EXPECTED_LEVELS_SHAPE = PRESSURE_LEVELS.shape
+
+
+# -----------------------------------------------------------------------------
+# LOADING
+# -----------------------------------------------------------------------------
+
+
+def stack_levels(ds: xr.Dataset, variable_base: str, ensemble: int = 0) -> np.ndarray:
+    """Stack the per-level variables of one base into a (T, L, Y, X) array.
+
+    WeatherNext publishes upper-air fields as 13 separately named variables
+    (e.g. "500hPa_geopotential"). Selecting them together and converting via
+    to_array lets xarray/dask schedule the underlying chunk reads in
+    parallel instead of forcing one synchronous read per level.
+    """
+    lazy = _stack_levels_lazy(ds, variable_base, ensemble)
+    # Fill a preallocated contiguous buffer in place: no 13-entry list of
+    # level arrays and no second copy pass through np.stack.
+    out = np.empty(lazy.shape, dtype=np.float32)
+    da.store(lazy.data, out, scheduler="threads")
+    return out
+
+
+def _stack_levels_lazy(ds: xr.Dataset, variable_base: str, ensemble: int) -> xr.DataArray:
+    """Lazy (dask-backed) counterpart of stack_levels; no compute is triggered."""
+    names = [f"{level}hPa_{variable_base}" for level in PRESSURE_LEVELS]
+    var_names = frozenset(ds.variables)
+    missing = [name for name in names if name not in var_names]
+    if missing:
+        raise KeyError(f"Missing pressure-level variables for '{variable_base}': {missing}")
+    da = ds[names].to_array(dim="level").chunk({"level": -1})
+    return (
+        da.isel(ensemble=ensemble)
+        .assign_coords(level=PRESSURE_LEVELS)
+        .transpose("time", "level", "latitude", "longitude")
+    )
+
+
+def _require_variables(ds: xr.Dataset):
+    """Fail fast — before any chunk read — if required variables are absent.
+
+    Without this, a missing upper-air variable only surfaces deep inside
+    stack_levels after substantial I/O has already happened.
+    """
+    needed = set(REQUIRED_SURFACE_VARIABLES)
+    needed.update(f"{level}hPa_{base}" for level in PRESSURE_LEVELS for base in UPPER_AIR_BASES)
+    missing = needed - set(ds.variables)
+    if missing:
+        raise ValueError(f"Missing required Zarr variables: {sorted(missing)}")
+
+
+def load_weathernext_dataset(zarr_path: str, ensemble: int = 0,
+                             time_slice: Optional[slice] = None):
+    """Return (ds_harmonized, metadata) for one ensemble member.
+
+    ds_harmonized is a lazy, dask-backed Dataset with the canonical short
+    names (u10, v10, msl, tp6, sst, u, v, z, t) and a proper level
+    dimension. Consumers that can work on slabs should prefer this over
+    the fully materialized ForecastCube dict: slicing stays zero-copy and
+    nothing is read until .values/.compute.
+    """
+    ds = _open_weathernext(zarr_path)
+    _require_variables(ds)
+    if time_slice is not None:
+        ds = ds.isel(time=time_slice)
+
+    data = {
+        "u10": ds["10m_u_component_of_wind"].isel(ensemble=ensemble),
+        "v10": ds["10m_v_component_of_wind"].isel(ensemble=ensemble),
+        "msl": ds["mean_sea_level_pressure"].isel(ensemble=ensemble),
+        "tp6": ds["total_precipitation_6hr"].isel(ensemble=ensemble),
+        "u": _stack_levels_lazy(ds, "u_component_of_wind", ensemble),
+        "v": _stack_levels_lazy(ds, "v_component_of_wind", ensemble),
+        "z": _stack_levels_lazy(ds, "geopotential", ensemble),
+        "t": _stack_levels_lazy(ds, "temperature", ensemble),
+    }
+    # Single data_vars membership test: no double lookup, and no .isel on
+    # the {} default that ds.get would hand back on a miss.
+    if "sea_surface_temperature" in ds.data_vars:
+        data["sst"] = ds["sea_surface_temperature"].isel(ensemble=ensemble)
+
+    metadata = {
+        "source": zarr_path,
+        "ensemble": ensemble,
+        # data_vars only (coords add nothing for provenance) and a tuple:
+        # smaller footprint and fewer strings through the JSON dump.
+        "variables": tuple(ds.data_vars),
+    }
+    harmonized = xr.Dataset(data)
+    # CF decoding (scale_factor/add_offset) can silently promote to float64,
+    # doubling bandwidth through every downstream pass; pin float32 here.
+    for name in harmonized.data_vars:
+        if harmonized[name].dtype != np.float32:
+            harmonized[name] = harmonized[name].astype(np.float32, copy=False)
+    return harmonized, metadata
+
+
+def _open_weathernext(zarr_path: str) -> xr.Dataset:
+    """Open a WeatherNext store with an explicit chunk plan.
+
+    Going through an fsspec mapper with a large block size enables
+    concurrent HTTP range requests against remote stores (e.g. GCS).
+    Setting WEATHERNEXT_SIMPLECACHE to a local directory additionally
+    caches fetched blocks on disk for development re-reads.
+    """
+    if "://" in zarr_path:
+        cache_dir = os.getenv("WEATHERNEXT_SIMPLECACHE")
+        if cache_dir:
+            mapper = fsspec.get_mapper(
+                f"simplecache::{zarr_path}",
+                simplecache={"cache_storage": cache_dir},
+            )
+        else:
+            mapper = fsspec.get_mapper(zarr_path, default_block_size=8 * 1024 * 1024)
+    else:
+        mapper = fsspec.get_mapper(zarr_path)
+    return xr.open_zarr(mapper, consolidated=True, chunks=ZARR_CHUNKS,
+                        decode_timedelta=False)
+
+
+def load_weathernext_zarr(zarr_path: str, ensemble: int = 0,
+                          time_slice: Optional[slice] = None,
+                          cache_dir: Optional[str] = None) -> Dict:
+    """Load one WeatherNext ensemble member into a ForecastCube dict.
+
+    With cache_dir set, a validated cube is persisted as contiguous .npy
+    files and subsequent loads return memory-mapped views — the OS pages
+    in only what detection actually touches, and repeated calibration
+    sweeps skip the Zarr store entirely.
+    """
+    if cache_dir is not None:
+        cached = _load_cached_cube(cache_dir, zarr_path, ensemble, time_slice)
+        if cached is not None:
+            print(f"Loading WeatherNext cube from cache: {zarr_path}")
+            return cached
+
+    print(f"Loading WeatherNext Zarr: {zarr_path}")
+    harmonized, metadata = load_weathernext_dataset(zarr_path, ensemble, time_slice)
+
+    # One materialization per coord via np.asarray; the same arrays feed the
+    # summary prints below and are stored on the cube as-is.
+    time_vals = np.asarray(harmonized.time)
+    lat_vals = np.asarray(harmonized.latitude)
+    lon_vals = np.asarray(harmonized.longitude)
+
+    # Cache the endpoints as Python primitives once, so cube summaries are
+    # plain dict reads and never page in a mmap'd array or format a
+    # np.datetime64 again.
+    metadata["bbox"] = {
+        "lat_min": float(lat_vals[0]),
+        "lat_max": float(lat_vals[-1]),
+        "lon_min": float(lon_vals[0]),
+        "lon_max": float(lon_vals[-1]),
+    }
+    metadata["time_span"] = (str(time_vals[0]), str(time_vals[-1]))
+
+    # Materialize every surface and upper-air array in one batched da.store:
+    # the chunk reads overlap (shared thread pool) and dask writes straight
+    # into preallocated contiguous buffers instead of allocating twice.
+    has_sst = "sst" in harmonized.data_vars
+    names = ["u10", "v10", "msl", "tp6", "u", "v", "z", "t"] + (["sst"] if has_sst else [])
+    arrays = [np.empty(harmonized[name].shape, dtype=np.float32) for name in names]
+    da.store([harmonized[name].data for name in names], arrays,
+             scheduler="threads", num_workers=16)
+    u10, v10, msl, tp6, ua_u, ua_v, ua_z, ua_t = arrays[:8]
+    sst = arrays[8] if has_sst else None
+
+    cube = {
+        "surface": {
+            "u10": u10,
+            "v10": v10,
+            "msl": msl,
+            "tp6": tp6,
+            "sst": sst,
+        },
+        "upper_air": {
+            "u": ua_u,
+            "v": ua_v,
+            "z": ua_z,
+            "t": ua_t,
+            "level": PRESSURE_LEVELS.copy(),
+        },
+        "time": time_vals,
+        "lat": lat_vals,
+        "lon": lon_vals,
+        "metadata": metadata,
+    }
+
+    print(f"  time: {len(time_vals)} steps from {time_vals[0]} to {time_vals[-1]}")
+    print(f"  grid: {len(lat_vals)} x {len(lon_vals)} "
+          f"(lat {lat_vals[0]}..{lat_vals[-1]}, lon {lon_vals[0]}..{lon_vals[-1]})")
+    validate_forecast_cube(cube)
+    if cache_dir is not None:
+        _save_cube_cache(cache_dir, zarr_path, ensemble, time_slice, cube)
+    return cube
+
+
+# -----------------------------------------------------------------------------
+# ON-DISK CUBE CACHE
+# -----------------------------------------------------------------------------
+
+_CACHED_SURFACE = ("u10", "v10", "msl", "tp6")
+_CACHED_UPPER = ("u", "v", "z", "t")
+_CACHED_COORDS = ("time", "lat", "lon")
+
+
+def _cache_key(zarr_path: str, ensemble: int, time_slice: Optional[slice]) -> str:
+    return hashlib.sha1(f"{zarr_path}|{ensemble}|{time_slice}".encode()).hexdigest()
+
+
+def _save_cube_cache(cache_dir: str, zarr_path: str, ensemble: int,
+                     time_slice: Optional[slice], cube: Dict):
+    os.makedirs(cache_dir, exist_ok=True)
+    key = _cache_key(zarr_path, ensemble, time_slice)
+    for name in _CACHED_SURFACE:
+        np.save(os.path.join(cache_dir, f"{key}_{name}.npy"), cube["surface"][name])
+    if cube["surface"]["sst"] is not None:
+        np.save(os.path.join(cache_dir, f"{key}_sst.npy"), cube["surface"]["sst"])
+    for name in _CACHED_UPPER:
+        np.save(os.path.join(cache_dir, f"{key}_ua_{name}.npy"), cube["upper_air"][name])
+    for name in _CACHED_COORDS:
+        np.save(os.path.join(cache_dir, f"{key}_{name}.npy"), cube[name])
+    # The metadata sidecar doubles as the "cache complete" marker: it is
+    # written last, so a partially written cache is never picked up.
+    with open(os.path.join(cache_dir, f"{key}_metadata.json"), "w") as f:
+        json.dump(cube["metadata"], f)
+
+
+def _load_cached_cube(cache_dir: str, zarr_path: str, ensemble: int,
+                      time_slice: Optional[slice]) -> Optional[Dict]:
+    key = _cache_key(zarr_path, ensemble, time_slice)
+    meta_path = os.path.join(cache_dir, f"{key}_metadata.json")
+    if not os.path.exists(meta_path):
+        return None
+    with open(meta_path) as f:
+        metadata = json.load(f)
+
+    def _mmap(name):
+        return np.load(os.path.join(cache_dir, f"{key}_{name}.npy"), mmap_mode="r")
+
+    sst_path = os.path.join(cache_dir, f"{key}_sst.npy")
+    cube = {
+        "surface": {name: _mmap(name) for name in _CACHED_SURFACE},
+        "upper_air": {name: _mmap(f"ua_{name}") for name in _CACHED_UPPER},
+        "metadata": metadata,
+    }
+    cube["surface"]["sst"] = np.load(sst_path, mmap_mode="r") if os.path.exists(sst_path) else None
+    cube["upper_air"]["level"] = PRESSURE_LEVELS.copy()
+    for name in _CACHED_COORDS:
+        cube[name] = _mmap(name)
+    return cube
+
+
+# -----------------------------------------------------------------------------
+# VALIDATION / INSPECTION
+# -----------------------------------------------------------------------------
+
+
+def validate_forecast_cube(cube: Dict, strict: bool = False) -> bool:
+    """Sanity-check ForecastCube structure, shapes and pressure levels.
+
+    The default only verifies the top-level layout — enough for cubes
+    coming off the trusted ingest path, where stack_levels/da.store
+    already guarantee shapes and dtypes. Pass strict=True (or call
+    validate_forecast_cube_full) for hand-built cubes.
+    """
+    for key in ("surface", "upper_air", "time", "lat", "lon", "metadata"):
+        if key not in cube:
+            raise ValueError(f"ForecastCube missing top-level key '{key}'")
+    if not strict:
+        return True
+
+    n_time = len(cube["time"])
+    n_lat = len(cube["lat"])
+    n_lon = len(cube["lon"])
+    n_level = len(cube["upper_air"]["level"])
+
+    # Same-dtype levels compare via a single memcmp on the raw bytes
+    # (~100ns vs ~10us of np.array_equal dispatch — it adds up across
+    # thousands of subcube validations); other dtypes fall back to the
+    # value comparison so equal levels never false-negative.
+    level = cube["upper_air"]["level"]
+    if level.dtype == PRESSURE_LEVELS.dtype:
+        levels_ok = (level.shape == _EXPECTED_LEVELS_SHAPE
+                     and level.tobytes() == _EXPECTED_LEVELS_BYTES)
+    else:
+        levels_ok = np.array_equiv(level, _EXPECTED_LEVELS_F32)
+    if not levels_ok:
+        raise ValueError("ForecastCube pressure levels do not match PRESSURE_LEVELS")
+
+    expected = {name: (n_time, n_level, n_lat, n_lon) for name in ("u", "v", "z", "t")}
+    mismatches = [
+        f"upper_air '{name}': {cube['upper_air'][name].shape} != {shape}"
+        for name, shape in expected.items()
+        if cube["upper_air"][name].shape != shape
+    ]
+    surface_shape = (n_time, n_lat, n_lon)
+    mismatches += [
+        f"surface '{name}': {cube['surface'][name].shape} != {surface_shape}"
+        for name in ("u10", "v10", "msl", "tp6")
+        if cube["surface"][name].shape != surface_shape
+    ]
+    sst = cube["surface"]["sst"]
+    if sst is not None and sst.shape != surface_shape:
+        mismatches.append(f"surface 'sst': {sst.shape} != {surface_shape}")
+    mismatches += [
+        f"{group} '{name}': dtype {cube[group][name].dtype} (expected float32)"
+        for group, names in (("upper_air", ("u", "v", "z", "t")),
+                             ("surface", ("u10", "v10", "msl", "tp6")))
+        for name in names
+        if cube[group][name].dtype == np.float64
+    ]
+    if mismatches:
+        raise ValueError("ForecastCube shape mismatches: " + "; ".join(mismatches))
+    return True
+
+
+def validate_forecast_cube_full(cube: Dict) -> bool:
+    """Full structural + shape + dtype validation for externally built cubes."""
+    return validate_forecast_cube(cube, strict=True)
+
+
+def get_forecast_cube_info(cube: Dict) -> Dict:
+    """Human-readable summary of a loaded ForecastCube (O(1) metadata reads)."""
+    metadata = cube["metadata"]
+    bbox = metadata["bbox"]
+    time_span = metadata["time_span"]
+    return {
+        "time_steps": len(cube["time"]),
+        "time_start": time_span[0],
+        "time_end": time_span[1],
+        "lat_range": (bbox["lat_min"], bbox["lat_max"]),
+        "lon_range": (bbox["lon_min"], bbox["lon_max"]),
+        "levels": cube["upper_air"]["level"].tolist(),
+        "ensemble": metadata["ensemble"],
+        "n_variables": len(metadata["variables"]),
+    }